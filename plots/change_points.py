@@ -0,0 +1,235 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from panel import MASTER_DATASET, indicator_columns, load_panel
+
+# Structural breaks for every country x indicator series.
+#
+# Segment costs are evaluated in O(1) from cumulative sums, so PELT runs in
+# (near) linear time per series and binary segmentation scores every split
+# point of a segment in one vectorized step. Costs:
+#   'mean'     piecewise constant level (squared error)
+#   'meanvar'  piecewise constant level and variance (Gaussian likelihood)
+#   'linear'   piecewise linear trend (squared error), suited to TFR/FLFP
+# Segments are at least min_size (default 5) years long. The default penalty
+# is BIC: (segment parameters + 1) * log(n), scaled for the squared-error
+# costs by the residual variance of a single-segment fit of the series.
+
+COSTS = {'mean': 1, 'meanvar': 2, 'linear': 2}
+METHODS = ['pelt', 'binseg']
+
+
+class SegmentCost:
+    """O(1) cost of segment y[s:t] from precomputed cumulative sums.
+
+    x holds the observation times (e.g. years) for the linear cost, so gaps
+    left by missing years are respected; it defaults to 0, 1, 2, ...
+    """
+
+    def __init__(self, y, cost='linear', x=None):
+        if cost not in COSTS:
+            raise ValueError(f"Unknown cost: {cost}")
+        self.cost = cost
+        x = np.arange(len(y), dtype=float) if x is None else np.asarray(x, dtype=float)
+        # Shift to the first time point to keep the cumulative sums well conditioned
+        x = x - x[0] if len(x) else x
+        zero = np.zeros(1)
+        self.s_y = np.concatenate([zero, np.cumsum(y)])
+        self.s_yy = np.concatenate([zero, np.cumsum(y * y)])
+        self.s_x = np.concatenate([zero, np.cumsum(x)])
+        self.s_xx = np.concatenate([zero, np.cumsum(x * x)])
+        self.s_xy = np.concatenate([zero, np.cumsum(x * y)])
+
+    def __call__(self, s, t):
+        """Cost of y[s:t]; s and t may be arrays (broadcast together)."""
+        n = t - s
+        sy = self.s_y[t] - self.s_y[s]
+        syy = self.s_yy[t] - self.s_yy[s] - sy * sy / n
+        if self.cost == 'mean':
+            return syy
+        if self.cost == 'meanvar':
+            return n * np.log(np.maximum(syy / n, 1e-12))
+        sx = self.s_x[t] - self.s_x[s]
+        sxx = self.s_xx[t] - self.s_xx[s] - sx * sx / n
+        sxy = self.s_xy[t] - self.s_xy[s] - sx * sy / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rss = syy - np.where(sxx > 0, sxy * sxy / sxx, 0.0)
+        return np.maximum(rss, 0.0)
+
+
+def default_penalty(y, cost, x=None):
+    n = len(y)
+    penalty = (COSTS[cost] + 1) * np.log(n)
+    if cost == 'meanvar':
+        return penalty
+    # Residual variance of the whole series fitted as one segment
+    sigma2 = SegmentCost(y, cost, x)(0, n) / max(n - COSTS[cost], 1)
+    return penalty * max(sigma2, 1e-12)
+
+
+def pelt(y, cost='linear', penalty=None, min_size=5, x=None):
+    """Optimal partition by PELT. Returns the sorted break indices into y."""
+    n = len(y)
+    if n < 2 * min_size:
+        return []
+    segment_cost = SegmentCost(y, cost, x)
+    if penalty is None:
+        penalty = default_penalty(y, cost, x)
+
+    F = np.full(n + 1, np.inf)
+    F[0] = -penalty
+    last = np.zeros(n + 1, dtype=int)
+    candidates = np.array([0])
+    for t in range(min_size, n + 1):
+        new = t - min_size
+        if new >= min_size:
+            candidates = np.append(candidates, new)
+        costs = F[candidates] + segment_cost(candidates, t)
+        best = costs.argmin()
+        F[t] = costs[best] + penalty
+        last[t] = candidates[best]
+        # Prune starts that can never be optimal again
+        candidates = candidates[costs <= F[t]]
+
+    breaks = []
+    t = last[n]
+    while t > 0:
+        breaks.append(int(t))
+        t = last[t]
+    return sorted(breaks)
+
+
+def binseg(y, cost='linear', penalty=None, min_size=5, max_breaks=10, x=None):
+    """Greedy binary segmentation. Returns the sorted break indices into y."""
+    n = len(y)
+    if n < 2 * min_size:
+        return []
+    segment_cost = SegmentCost(y, cost, x)
+    if penalty is None:
+        penalty = default_penalty(y, cost, x)
+
+    breaks = []
+    segments = [(0, n)]
+    while segments and len(breaks) < max_breaks:
+        best = None
+        for s, t in segments:
+            splits = np.arange(s + min_size, t - min_size + 1)
+            if len(splits) == 0:
+                continue
+            gains = segment_cost(s, t) - segment_cost(s, splits) - segment_cost(splits, t)
+            i = gains.argmax()
+            if best is None or gains[i] > best[0]:
+                best = (gains[i], s, int(splits[i]), t)
+        if best is None or best[0] <= penalty:
+            break
+        _, s, k, t = best
+        breaks.append(k)
+        segments.remove((s, t))
+        segments += [(s, k), (k, t)]
+    return sorted(breaks)
+
+
+def segment_table(years, values, breaks):
+    """Per-segment statistics: years covered, mean level and the linear fit
+    (Slope, and the fitted values Start_value and End_value at its end years)."""
+    bounds = [0] + list(breaks) + [len(values)]
+    rows = []
+    for i, (s, t) in enumerate(zip(bounds[:-1], bounds[1:])):
+        x, y = years[s:t], values[s:t]
+        if t - s > 1:
+            slope, intercept = np.polyfit(x - x[0], y, 1)
+        else:
+            slope, intercept = np.nan, y[0]
+        rows.append({'Segment': i, 'Start_year': int(x[0]), 'End_year': int(x[-1]),
+                     'N': t - s, 'Mean': y.mean(), 'Slope': slope, 'Start_value': intercept,
+                     'End_value': intercept + np.nan_to_num(slope) * (x[-1] - x[0])})
+    return rows
+
+
+def detect_breaks(years, values, method='pelt', cost='linear', penalty=None, min_size=5):
+    """Breaks of one series (missing values dropped). Returns segment rows."""
+    years, values = np.asarray(years), np.asarray(values, dtype=float)
+    keep = ~np.isnan(values)
+    years, values = years[keep], values[keep]
+    if len(values) == 0:
+        return []
+    if method == 'pelt':
+        breaks = pelt(values, cost, penalty, min_size, x=years)
+    elif method == 'binseg':
+        breaks = binseg(values, cost, penalty, min_size, x=years)
+    else:
+        raise ValueError(f"Unknown change-point method: {method}")
+    return segment_table(years, values, breaks)
+
+
+def _detect_series(args):
+    key, years, values, method, cost, penalty, min_size = args
+    return key, detect_breaks(years, values, method, cost, penalty, min_size)
+
+
+def detect_long(df, keys, year_col, value_col, method='pelt', cost='linear',
+                penalty=None, min_size=5, n_jobs=1):
+    """Run change-point detection on every series of a long frame.
+
+    keys are the columns identifying a series (e.g. ['Country']). Returns one
+    row per segment; segments after the first start at a break year.
+    """
+    tasks = [(key if isinstance(key, tuple) else (key,), group[year_col].to_numpy(),
+              group[value_col].to_numpy(), method, cost, penalty, min_size)
+             for key, group in df.sort_values(year_col).groupby(keys, sort=True, observed=True)]
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_detect_series, tasks, chunksize=16))
+    else:
+        results = [_detect_series(task) for task in tasks]
+
+    rows = [dict(zip(keys, key), **segment) for key, segments in results for segment in segments]
+    columns = keys + ['Segment', 'Start_year', 'End_year', 'N', 'Mean', 'Slope',
+                      'Start_value', 'End_value']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def detect_panel(df, indicators=None, **kwargs):
+    """Segments for every country x indicator series of the master panel."""
+    if indicators is None:
+        indicators = indicator_columns(df)
+    long = df.melt(id_vars=['Country', 'Year'], value_vars=indicators,
+                   var_name='Indicator', value_name='Value').dropna(subset=['Value'])
+    return detect_long(long, ['Country', 'Indicator'], 'Year', 'Value', **kwargs)
+
+
+def annotate_breaks(ax, segments, color='#d62728'):
+    """Mark break years and per-segment linear fits on an existing trend axis."""
+    for _, segment in segments.iterrows():
+        if segment['Segment'] > 0:
+            ax.axvline(segment['Start_year'], color=color, linestyle=':', linewidth=1.5, alpha=0.8)
+        ax.plot([segment['Start_year'], segment['End_year']],
+                [segment['Start_value'], segment['End_value']],
+                color=color, linestyle='--', linewidth=1, alpha=0.6)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Change-point detection for the master panel')
+    parser.add_argument('--data', default=MASTER_DATASET)
+    parser.add_argument('--method', choices=METHODS, default='pelt')
+    parser.add_argument('--cost', choices=sorted(COSTS), default='linear')
+    parser.add_argument('--penalty', type=float, help='Penalty per break (default: BIC)')
+    parser.add_argument('--min-size', type=int, default=5, help='Minimum segment length in years')
+    parser.add_argument('--jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    print("Loading and processing data...")
+    segments = detect_panel(load_panel(args.data), method=args.method, cost=args.cost,
+                            penalty=args.penalty, min_size=args.min_size, n_jobs=args.jobs)
+    segments.to_csv('change_points.csv', index=False)
+
+    breaks = segments[segments['Segment'] > 0]
+    print(f"Found {len(breaks)} breaks in {segments.groupby(['Country', 'Indicator']).ngroups} series")
+    for indicator in ['TFR', 'FLFP']:
+        print(f"\n{indicator} break years:")
+        for country, group in breaks[breaks['Indicator'] == indicator].groupby('Country'):
+            print(f"  {country}: {', '.join(str(year) for year in group['Start_year'])}")
+    print("\nSaved to 'change_points.csv'")
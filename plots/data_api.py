@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote
+
+import pandas as pd
+
+from panel import MASTER_DATASET, indicator_columns, load_panel
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow output is optional, JSON always works
+    pa = None
+
+# Local read-only HTTP service over the cleaned master panel.
+#
+#   GET /indicators                       list of indicator columns
+#   GET /series/<Indicator>?country=...   indicator time series (all or some countries)
+#   GET /correlations/<Country>           indicator correlation table for one country
+#   GET /groups/<Indicator>               Developed/Developing summary per year
+#
+# Add ?format=arrow (or Accept: application/vnd.apache.arrow.stream) for Arrow IPC.
+# Every response body is built once, memoized together with its gzip variant
+# and ETag, and only rebuilt when master_dataset.csv changes on disk.
+# Country-filtered responses are kept in a bounded LRU.
+
+JSON_TYPE = 'application/json'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+MAX_HEADER_LINES = 100
+MAX_QUERY_RESPONSES = 256
+
+
+class Response:
+    """A fully rendered response body with its gzip variant and ETag."""
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.gzip_etag = self.etag[:-1] + '-gz"'
+
+
+class PanelSnapshot:
+    """Memoized responses over one parsed version of the panel.
+
+    Unfiltered resources are few and kept for the snapshot's lifetime;
+    country-filtered responses go through a bounded LRU.
+    """
+
+    def __init__(self, panel, mtime):
+        self.panel = panel
+        self.mtime = mtime
+        self.responses = {}
+        self.queries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def resource_paths(self):
+        yield ('indicators',)
+        for indicator in indicator_columns(self.panel):
+            yield ('series', indicator)
+            yield ('groups', indicator)
+        for country in self.panel['Country'].unique():
+            yield ('correlations', country)
+
+    def cached(self, key):
+        if not key[1]:
+            return self.responses.get(key)
+        with self.lock:
+            response = self.queries.get(key)
+            if response is not None:
+                self.queries.move_to_end(key)
+            return response
+
+    def get(self, parts, countries, fmt):
+        key = (parts, countries, fmt)
+        response = self.cached(key)
+        if response is not None:
+            return response
+        response = render(self.build(parts, countries), fmt)
+        if not countries:
+            self.responses[key] = response
+            return response
+        with self.lock:
+            self.queries[key] = response
+            if len(self.queries) > MAX_QUERY_RESPONSES:
+                self.queries.popitem(last=False)
+        return response
+
+    def build(self, parts, countries):
+        df = self.panel
+        indicators = indicator_columns(df)
+
+        if parts == ('indicators',):
+            return pd.DataFrame({'Indicator': indicators})
+
+        if len(parts) != 2:
+            raise KeyError(parts)
+        resource, name = parts
+
+        if resource == 'series' and name in indicators:
+            series = df[['Country', 'Year', name]].dropna(subset=[name])
+            if countries:
+                series = series[series['Country'].isin(countries)]
+            return series.reset_index(drop=True)
+
+        if resource == 'correlations' and name in set(df['Country']):
+            corr = df.loc[df['Country'] == name, indicators].corr()
+            return corr.rename_axis('Indicator').reset_index()
+
+        if resource == 'groups' and name in indicators:
+            summary = (df.dropna(subset=[name])
+                         .groupby(['Country_Group', 'Year'])[name]
+                         .agg(['count', 'mean', 'median', 'std', 'min', 'max']))
+            return summary.reset_index()
+
+        raise KeyError(parts)
+
+
+class PanelCache:
+    """Current panel snapshot, replaced whole when the file changes on disk."""
+
+    def __init__(self, path=MASTER_DATASET):
+        self.path = path
+        self.snapshot = None
+
+    def stale(self):
+        return self.snapshot is None or os.stat(self.path).st_mtime_ns != self.snapshot.mtime
+
+    def warm(self):
+        """Parse the panel and precompute the default JSON response for every
+        resource, then publish the new snapshot in one assignment."""
+        mtime = os.stat(self.path).st_mtime_ns
+        snapshot = PanelSnapshot(load_panel(self.path), mtime)
+        for parts in snapshot.resource_paths():
+            snapshot.get(parts, (), 'json')
+        self.snapshot = snapshot
+
+
+def render(frame, fmt):
+    if fmt == 'arrow':
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), ARROW_TYPE)
+    body = frame.to_json(orient='records', double_precision=6).encode('utf-8')
+    return Response(body, JSON_TYPE)
+
+
+def resource_parts(path):
+    """Normalized cache key of a URL path: its unquoted, non-empty segments."""
+    return tuple(unquote(part) for part in path.split('/') if part)
+
+
+def error_response(status, message):
+    return status, Response(json.dumps({'error': message}).encode('utf-8'), JSON_TYPE)
+
+
+class DataServer:
+    def __init__(self, path=MASTER_DATASET):
+        self.cache = PanelCache(path)
+        self.lock = asyncio.Lock()
+
+    async def ensure_fresh(self):
+        # os.stat is cheap; a re-parse only happens when the CSV was rewritten
+        try:
+            if self.cache.stale():
+                async with self.lock:
+                    if self.cache.stale():
+                        await asyncio.get_running_loop().run_in_executor(None, self.cache.warm)
+        except (OSError, ValueError, KeyError) as exc:
+            # Missing or half-written file: keep serving the last good snapshot
+            print(f"Could not reload {self.cache.path}: {exc!r}")
+        return self.cache.snapshot
+
+    async def lookup(self, target, headers):
+        # Split by hand: urlsplit reads a leading '//' as a network location
+        path, _, query = target.partition('?')
+        query = parse_qs(query)
+        countries = tuple(sorted(query.get('country', [])))
+        fmt = query.get('format', [None])[0]
+        if fmt is None:
+            fmt = 'arrow' if ARROW_TYPE in headers.get('accept', '') else 'json'
+        if fmt not in ('json', 'arrow'):
+            return error_response(400, f'unknown format {fmt!r}')
+        if fmt == 'arrow' and pa is None:
+            return error_response(406, 'pyarrow is not installed')
+
+        # Pin one snapshot so a concurrent reload cannot mix old and new data
+        snapshot = await self.ensure_fresh()
+        if snapshot is None:
+            return error_response(503, 'panel data is not available yet')
+        parts = resource_parts(path)
+        response = snapshot.cached((parts, countries, fmt))
+        if response is not None:
+            return 200, response
+        try:
+            # Cache misses (e.g. new country filters) are built off the event loop
+            response = await asyncio.get_running_loop().run_in_executor(
+                None, snapshot.get, parts, countries, fmt)
+        except KeyError:
+            return error_response(404, f'no such resource {path!r}')
+        return 200, response
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                if method in ('GET', 'HEAD'):
+                    status, response = await self.lookup(target, headers)
+                else:
+                    status, response = error_response(405, f'method {method} not allowed')
+
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                writer.write(self.encode(status, response, method, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def encode(self, status, response, method, headers, keep_alive):
+        use_gzip = 'gzip' in headers.get('accept-encoding', '')
+        body = response.gzip_body if use_gzip else response.body
+        etag = response.gzip_etag if use_gzip else response.etag
+
+        lines = [
+            f'Content-Type: {response.content_type}',
+            'Vary: Accept, Accept-Encoding',
+            'Cache-Control: no-cache',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        if status == 200:
+            lines.append(f'ETag: {etag}')
+            if_none_match = headers.get('if-none-match', '')
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            if etag in tags or '*' in tags:
+                status, body = 304, b''
+        if body and use_gzip:
+            lines.append('Content-Encoding: gzip')
+        lines.append(f'Content-Length: {len(body)}')
+
+        reason = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                  405: 'Method Not Allowed', 406: 'Not Acceptable',
+                  503: 'Service Unavailable'}[status]
+        head = f'HTTP/1.1 {status} {reason}\r\n' + '\r\n'.join(lines) + '\r\n\r\n'
+        return head.encode('latin-1') + (b'' if method == 'HEAD' else body)
+
+
+async def serve(path, host, port):
+    server = DataServer(path)
+    snapshot = await server.ensure_fresh()
+    if snapshot is not None:
+        print(f"Precomputed {len(snapshot.responses)} responses from {path}")
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving panel data on http://{host}:{port}/")
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local HTTP API over the master panel')
+    parser.add_argument('--data', default=MASTER_DATASET)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(serve(args.data, args.host, args.port))
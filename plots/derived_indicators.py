@@ -0,0 +1,131 @@
+import argparse
+import ast
+
+import pandas as pd
+
+from panel import MASTER_DATASET, indicator_columns, load_panel
+
+# Derived indicators are declared once as formulas over panel columns (or other
+# derived indicators) and evaluated column-wise on the aligned country-year
+# panel. Missing inputs give missing outputs, which matches the inner_join used
+# by R/datacleaningscripts/create_pension_financing_gap.R.
+
+DEFAULT_FORMULAS = {
+    'Pension_gap_per_dependency_point': 'Pension_financing_gap / Old_age_dependency',
+    'FLFP_x_tertiary_education': 'FLFP * Female_tertiary_education',
+    'Contribution_coverage': 'Social_security_GDP / Pension_GDP',
+}
+
+
+def formula_inputs(expression):
+    """Column names referenced by a formula (function names are excluded)."""
+    tree = ast.parse(expression, mode='eval')
+    called = {node.func.id for node in ast.walk(tree)
+              if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)}
+    names = [node.id for node in ast.walk(tree) if isinstance(node, ast.Name)]
+    return sorted(set(names) - called)
+
+
+class DerivedIndicators:
+    """Lazily evaluated, cached derived indicators over the master panel.
+
+    A derived column is only computed when requested. Its cached value is
+    reused until one of its inputs (base columns changed through update(), or
+    derived inputs redefined or recomputed) has a new version.
+    """
+
+    def __init__(self, df, formulas=DEFAULT_FORMULAS):
+        self.panel = df.set_index(['Country', 'Year'])[indicator_columns(df)].astype(float)
+        self.versions = {col: 0 for col in self.panel.columns}
+        self.formulas = {}
+        self.inputs = {}
+        self.cache = {}
+        for name, expression in formulas.items():
+            self.define(name, expression)
+
+    def define(self, name, expression):
+        if name in self.panel.columns:
+            raise ValueError(f"{name} is already a base indicator")
+        try:
+            inputs = formula_inputs(expression)
+        except SyntaxError as exc:
+            raise ValueError(f"Cannot parse formula for {name}: {expression!r}") from exc
+        unknown = [col for col in inputs if col not in self.versions]
+        if unknown:
+            raise KeyError(f"Unknown indicators in formula for {name}: {unknown}")
+        if name in self._dependencies(inputs):
+            raise ValueError(f"Formula for {name} depends on itself")
+        try:
+            # Check the formula evaluates before it replaces any definition
+            probe = pd.DataFrame(columns=inputs, dtype=float).eval(expression)
+        except Exception as exc:
+            raise ValueError(f"Cannot evaluate formula for {name}: {expression!r} ({exc})") from exc
+        if not isinstance(probe, pd.Series):
+            raise ValueError(f"Formula for {name} does not give one value per country-year: {expression!r}")
+        self.formulas[name] = expression
+        self.inputs[name] = inputs
+        self.versions[name] = self.versions.get(name, -1) + 1
+
+    def _dependencies(self, names):
+        seen = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in seen:
+                seen.add(name)
+                stack.extend(self.inputs.get(name, []))
+        return seen
+
+    def update(self, indicator, values):
+        """Replace cells of a base indicator; values is indexed by (Country, Year).
+
+        Derived indicators that depend on it are recomputed on their next get().
+        """
+        if indicator in self.formulas:
+            raise ValueError(f"{indicator} is derived; redefine it instead")
+        values = values.reindex(self.panel.index.intersection(values.index))
+        if indicator not in self.panel.columns:
+            self.panel[indicator] = float('nan')
+            self.versions[indicator] = -1
+        self.panel.loc[values.index, indicator] = values.astype(float)
+        self.versions[indicator] += 1
+
+    def _key(self, name):
+        if name not in self.formulas:
+            return self.versions[name]
+        return (self.versions[name], tuple(self._key(col) for col in self.inputs[name]))
+
+    def get(self, name):
+        """Return a base or derived indicator as a Series indexed by (Country, Year)."""
+        if name not in self.formulas:
+            return self.panel[name]
+        key = self._key(name)
+        cached = self.cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        frame = pd.DataFrame({col: self.get(col) for col in self.inputs[name]})
+        values = frame.eval(self.formulas[name]).rename(name)
+        self.cache[name] = (key, values)
+        return values
+
+    def frame(self, names=None):
+        """Wide frame of the requested (default: all derived) indicators."""
+        if names is None:
+            names = list(self.formulas)
+        return pd.DataFrame({name: self.get(name) for name in names}).reset_index()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluate derived indicators on the master panel')
+    parser.add_argument('--data', default=MASTER_DATASET)
+    args = parser.parse_args()
+
+    print("Loading and processing data...")
+    derived = DerivedIndicators(load_panel(args.data))
+    result = derived.frame()
+    result.to_csv('derived_indicators.csv', index=False)
+
+    print("\nDerived indicators:")
+    for name, expression in derived.formulas.items():
+        print(f"  {name} = {expression} ({result[name].notna().sum()} observations)")
+    print("\nSaved to 'derived_indicators.csv'")
@@ -1,37 +1,19 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
+from change_points import annotate_breaks, detect_long
+from wdi_reshape import read_wdi_long
 
 # Load the data
 print("Loading and processing data...")
-df = pd.read_csv('Female labor force participation rate.csv', skiprows=4)  # Skip header rows
-
-# Clean the data - remove rows with all NaN values and select relevant columns
-df_clean = df.dropna(how='all')
-df_clean = df_clean[df_clean['Country Name'].notna()]
-
-# Convert from wide to long format
-year_columns = [col for col in df_clean.columns if col.isdigit()]
-df_long = df_clean.melt(
-    id_vars=['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code'],
-    value_vars=year_columns,
-    var_name='Year',
-    value_name='Participation_Rate'
-)
-
-# Convert Year to int and Participation_Rate to float
-df_long['Year'] = pd.to_numeric(df_long['Year'], errors='coerce')
-df_long['Participation_Rate'] = pd.to_numeric(df_long['Participation_Rate'], errors='coerce')
-
-# Drop rows with missing values
-df_long = df_long.dropna(subset=['Year', 'Participation_Rate', 'Country Name'])
+# Stream the wide World Bank file into non-null (country, year, value) rows
+df_long = read_wdi_long('Female labor force participation rate.csv', value_name='Participation_Rate')
 
 # Sort the data
 df_long = df_long.sort_values(['Country Name', 'Year'])
 
 # Filter for countries with sufficient data (at least 10 data points)
-country_counts = df_long.groupby('Country Name').size()
+country_counts = df_long.groupby('Country Name', observed=True).size()
 countries_with_data = country_counts[country_counts >= 10].index
 df_filtered = df_long[df_long['Country Name'].isin(countries_with_data)]
 
@@ -39,6 +21,9 @@ print(f"Number of countries with sufficient data: {len(countries_with_data)}")
 print(f"Year range: {df_filtered['Year'].min()} - {df_filtered['Year'].max()}")
 print(f"Total data points: {len(df_filtered)}")
 
+# Detect structural breaks in every country's participation trend
+breaks = detect_long(df_long, ['Country Name'], 'Year', 'Participation_Rate')
+
 # Create PDF file
 with PdfPages('female_labor_force_participation.pdf') as pdf:
     
@@ -105,6 +90,7 @@ with PdfPages('female_labor_force_participation.pdf') as pdf:
         
         axes[i].plot(country_data['Year'], country_data['Participation_Rate'], 
                      marker='o', linewidth=2, markersize=3, color='#1f77b4')
+        annotate_breaks(axes[i], breaks[breaks['Country Name'] == country])
         axes[i].set_title(f'{country}', fontsize=10, fontweight='bold')
         axes[i].set_xlabel('Year', fontsize=8)
         axes[i].set_ylabel('Participation Rate (%)', fontsize=8)
@@ -207,6 +193,7 @@ with PdfPages('female_labor_force_participation_selected.pdf') as pdf:
         country_data = df_selected[df_selected['Country Name'] == country]
         axes[i].plot(country_data['Year'], country_data['Participation_Rate'], 
                      marker='o', linewidth=2, markersize=3, color='#1f77b4')
+        annotate_breaks(axes[i], breaks[breaks['Country Name'] == country])
         axes[i].set_title(f'{country}', fontsize=10, fontweight='bold')
         axes[i].set_xlabel('Year', fontsize=8)
         axes[i].set_ylabel('Participation Rate (%)', fontsize=8)
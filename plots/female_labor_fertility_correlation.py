@@ -4,11 +4,11 @@ import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
 from scipy.stats import pearsonr
 import seaborn as sns
+from wdi_reshape import read_wdi_long
 
 # --- Load and process Female Labor Force Participation Rate data ---
 print("Loading and processing female labor force participation data...")
-labor_df = pd.read_csv('Female labor force participation rate.csv', skiprows=4)
-labor_df = labor_df.dropna(subset=['Country Name'])
+labor_long = read_wdi_long('Female labor force participation rate.csv', value_name='LaborForceRate')
 
 # Create country name mapping to standardize names between datasets
 country_mapping = {
@@ -20,18 +20,7 @@ country_mapping = {
 }
 
 # Apply country name mapping to labor force data
-labor_df['Country Name'] = labor_df['Country Name'].replace(country_mapping)
-
-year_columns = [col for col in labor_df.columns if col.isdigit()]
-labor_long = labor_df.melt(
-    id_vars=['Country Name', 'Country Code'],
-    value_vars=year_columns,
-    var_name='Year',
-    value_name='LaborForceRate'
-)
-labor_long['Year'] = pd.to_numeric(labor_long['Year'], errors='coerce')
-labor_long['LaborForceRate'] = pd.to_numeric(labor_long['LaborForceRate'], errors='coerce')
-labor_long = labor_long.dropna(subset=['LaborForceRate'])
+labor_long['Country Name'] = labor_long['Country Name'].astype(str).replace(country_mapping)
 
 # --- Load and process Fertility Rate data ---
 print("Loading and processing fertility rate data...")
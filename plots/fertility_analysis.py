@@ -2,6 +2,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
+from change_points import annotate_breaks, detect_long
 
 # Load and clean the data
 print("Loading and processing data...")
@@ -13,6 +14,9 @@ df_clean['OBS_VALUE'] = pd.to_numeric(df_clean['OBS_VALUE'], errors='coerce')
 df_clean = df_clean.dropna()
 df_clean = df_clean.sort_values(['Country', 'TIME_PERIOD'])
 
+# Detect structural breaks in every country's fertility trend
+breaks = detect_long(df_clean, ['Country'], 'TIME_PERIOD', 'OBS_VALUE')
+
 # Create PDF file
 with PdfPages('fertility_rate.pdf') as pdf:
     
@@ -78,6 +82,7 @@ with PdfPages('fertility_rate.pdf') as pdf:
         
         axes[i].plot(country_data['TIME_PERIOD'], country_data['OBS_VALUE'], 
                      marker='o', linewidth=2, markersize=4, color='#1f77b4')
+        annotate_breaks(axes[i], breaks[breaks['Country'] == country])
         axes[i].set_title(f'{country}', fontsize=12, fontweight='bold')
         axes[i].set_xlabel('Year', fontsize=10)
         axes[i].set_ylabel('Fertility Rate', fontsize=10)
@@ -104,4 +109,7 @@ print("PDF file 'fertility_rate.pdf' has been created successfully!")
 print(f"Contains {n_countries} countries with data from {df_clean['TIME_PERIOD'].min()} to {df_clean['TIME_PERIOD'].max()}")
 print("\nSummary statistics:")
 summary = df_clean.groupby('Country')['OBS_VALUE'].agg(['mean', 'min', 'max', 'count']).round(2)
-print(summary) 
\ No newline at end of file
+print(summary)
+print("\nFertility trend break years:")
+for country, group in breaks[breaks['Segment'] > 0].groupby('Country'):
+    print(f"  {country}: {', '.join(str(year) for year in group['Start_year'])}") 
\ No newline at end of file
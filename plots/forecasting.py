@@ -0,0 +1,258 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+from scipy.stats import norm
+
+from panel import MASTER_DATASET, load_panel, panel_cube
+
+# Batched forecasts for every country x indicator series of the master panel.
+# Each series is a row of a (n_series, n_years) array with NaN for missing
+# years; the smoothing recursions and AR fits run over all rows at once.
+
+DEFAULT_INDICATORS = ['FLFP', 'TFR', 'Old_age_dependency', 'Pension_financing_gap']
+
+# Parameter grids searched jointly for all series. Trend updates use the
+# error-correction form b += alpha * beta * error, phi is the damping factor.
+ALPHA_GRID = np.linspace(0.05, 0.95, 10)
+BETA_GRID = np.linspace(0.05, 0.95, 7)
+PHI_GRID = np.array([0.8, 0.85, 0.9, 0.95, 0.98])
+
+INIT_STEPS = 5
+
+METHODS = ['ses', 'holt', 'damped', 'ar']
+
+
+def _parameter_grid(method):
+    if method == 'ses':
+        betas, phis = np.array([0.0]), np.array([1.0])
+    elif method == 'holt':
+        betas, phis = BETA_GRID, np.array([1.0])
+    elif method == 'damped':
+        betas, phis = BETA_GRID, PHI_GRID
+    else:
+        raise ValueError(f"Unknown smoothing method: {method}")
+    alpha, beta, phi = np.meshgrid(ALPHA_GRID, betas, phis, indexing='ij')
+    return alpha.ravel(), beta.ravel(), phi.ravel()
+
+
+def _observed_span(y):
+    observed = ~np.isnan(y)
+    first = observed.argmax(axis=1)
+    last = y.shape[1] - 1 - observed[:, ::-1].argmax(axis=1)
+    return observed, first, last
+
+
+def smoothing_forecast(y, horizon, method='damped', level=0.95):
+    """Exponential smoothing for every row of y at once.
+
+    Parameters are picked per row from a shared grid by one-step-ahead squared
+    error. Missing years inside a series carry the one-step forecast forward;
+    forecasts start after each row's own last observed year.
+    Returns (forecast, lower, upper), each of shape (n_series, horizon).
+    """
+    alpha, beta, phi = _parameter_grid(method)
+    n_series, n_years = y.shape
+    rows = np.arange(n_series)
+    observed, first, last = _observed_span(y)
+
+    # Level starts at the first observation, trend at the mean early change
+    lvl0 = y[rows, first]
+    if method == 'ses':
+        trd0 = np.zeros(n_series)
+    else:
+        # First INIT_STEPS year-on-year changes counted from each row's own start
+        diffs = np.diff(y, axis=1) if n_years > 1 else np.full((n_series, 1), np.nan)
+        idx = first[:, None] + np.arange(INIT_STEPS)[None, :]
+        early = np.take_along_axis(diffs, np.minimum(idx, diffs.shape[1] - 1), axis=1)
+        usable = (idx < last[:, None]) & ~np.isnan(early)
+        early = np.where(usable, early, 0.0)
+        n_early = usable.sum(axis=1)
+        trd0 = early.sum(axis=1) / np.maximum(n_early, 1)
+
+    # State arrays of shape (n_series, n_params)
+    lvl = np.repeat(lvl0[:, None], len(alpha), axis=1)
+    trd = np.repeat(trd0[:, None], len(alpha), axis=1)
+    sse = np.zeros_like(lvl)
+    n_err = np.zeros(n_series)
+
+    for t in range(n_years):
+        step = ((t > first) & (t <= last))[:, None]
+        active = step[:, 0] & observed[:, t]
+        pred = lvl + phi * trd
+        err = np.where(active[:, None], np.nan_to_num(y[:, t, None]) - pred, 0.0)
+        sse += err ** 2
+        n_err += active
+        lvl = np.where(step, pred + alpha * err, lvl)
+        trd = np.where(step, phi * trd + alpha * beta * err, trd)
+
+    best = sse.argmin(axis=1)
+    a, b, p = alpha[best], beta[best], phi[best]
+    lvl, trd = lvl[rows, best], trd[rows, best]
+    sigma2 = sse[rows, best] / np.maximum(n_err - 1, 1)
+
+    # phi_cum[:, h-1] = phi + phi^2 + ... + phi^h
+    phi_cum = np.cumsum(p[:, None] ** np.arange(1, horizon + 1)[None, :], axis=1)
+    forecast = lvl[:, None] + phi_cum * trd[:, None]
+
+    # Additive-error damped trend: var_h = sigma^2 * (1 + sum_{j<h} c_j^2)
+    # with c_j = alpha * (1 + beta * phi_cum_j)
+    c = a[:, None] * (1 + b[:, None] * phi_cum[:, :-1])
+    var = sigma2[:, None] * (1 + np.concatenate(
+        [np.zeros((n_series, 1)), np.cumsum(c ** 2, axis=1)], axis=1))
+    half = norm.ppf((1 + level) / 2) * np.sqrt(var)
+    return forecast, forecast - half, forecast + half
+
+
+def ar_forecast(y, horizon, level=0.95):
+    """AR(1) with intercept, fitted by least squares to every row at once.
+
+    Only consecutive observed pairs enter the fit, so gaps are allowed.
+    Returns (forecast, lower, upper), each of shape (n_series, horizon).
+    """
+    n_series, n_years = y.shape
+    rows = np.arange(n_series)
+    observed, first, last = _observed_span(y)
+
+    x_prev, x_next = y[:, :-1], y[:, 1:]
+    pair = ~np.isnan(x_prev) & ~np.isnan(x_next)
+    n = pair.sum(axis=1)
+    xp = np.where(pair, x_prev, 0.0)
+    xn = np.where(pair, x_next, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_p = xp.sum(axis=1) / n
+        mean_n = xn.sum(axis=1) / n
+        cov = (np.where(pair, (x_prev - mean_p[:, None]) * (x_next - mean_n[:, None]), 0.0)).sum(axis=1)
+        var_p = (np.where(pair, (x_prev - mean_p[:, None]) ** 2, 0.0)).sum(axis=1)
+        coef = np.where(var_p > 0, cov / var_p, 1.0)
+        # Keep forecasts stationary or at most a random walk
+        coef = np.clip(np.nan_to_num(coef, nan=1.0), -0.99, 1.0)
+        intercept = np.nan_to_num(mean_n - coef * mean_p)
+        resid = np.where(pair, x_next - intercept[:, None] - coef[:, None] * x_prev, 0.0)
+        sigma2 = (resid ** 2).sum(axis=1) / np.maximum(n - 2, 1)
+
+    forecast = np.empty((n_series, horizon))
+    current = y[rows, last]
+    for h in range(horizon):
+        current = intercept + coef * current
+        forecast[:, h] = current
+
+    # var_h = sigma^2 * sum_{j<h} coef^(2j)
+    var = sigma2[:, None] * np.cumsum(coef[:, None] ** (2 * np.arange(horizon))[None, :], axis=1)
+    half = norm.ppf((1 + level) / 2) * np.sqrt(var)
+    return forecast, forecast - half, forecast + half
+
+
+def _forecast_block(args):
+    y, horizon, method, level = args
+    if method == 'ar':
+        return ar_forecast(y, horizon, level)
+    return smoothing_forecast(y, horizon, method, level)
+
+
+def forecast_panel(df, indicators=DEFAULT_INDICATORS, end_year=2030, method='damped',
+                   level=0.95, min_obs=8, n_jobs=1, chunk_size=256):
+    """Forecast every country x indicator series of the panel up to end_year.
+
+    Series with fewer than min_obs observations are skipped. With n_jobs > 1
+    the series are split into chunks and fitted in a process pool.
+    Returns a long frame with Country, Indicator, Year, Forecast, Lower, Upper.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown forecasting method: {method}")
+    countries, years, cube = panel_cube(df, indicators)
+
+    # Flatten the cube to one row per (indicator, country) series
+    y = cube.transpose(2, 0, 1).reshape(-1, len(years))
+    keep = (~np.isnan(y)).sum(axis=1) >= min_obs
+    y = y[keep]
+    names = np.array([(ind, c) for ind in indicators for c in countries], dtype=object)[keep]
+    if len(y) == 0:
+        return pd.DataFrame(columns=['Country', 'Indicator', 'Year', 'Forecast', 'Lower', 'Upper'])
+
+    _, _, last = _observed_span(y)
+    last_years = years[last]
+    horizon = max(int(end_year - last_years.min()), 1)
+
+    blocks = [(y[i:i + chunk_size], horizon, method, level) for i in range(0, len(y), chunk_size)]
+    if n_jobs > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_forecast_block, blocks))
+    else:
+        results = [_forecast_block(block) for block in blocks]
+    forecast, lower, upper = (np.concatenate(parts) for parts in zip(*results))
+
+    # Long format, dropping steps beyond end_year for series that end later
+    steps = np.arange(1, horizon + 1)
+    target_years = last_years[:, None] + steps[None, :]
+    mask = target_years <= end_year
+    series_idx = np.nonzero(mask)[0]
+    return pd.DataFrame({
+        'Country': names[series_idx, 1],
+        'Indicator': names[series_idx, 0],
+        'Year': target_years[mask],
+        'Forecast': forecast[mask],
+        'Lower': lower[mask],
+        'Upper': upper[mask],
+    })
+
+
+def plot_forecast(ax, history, forecast, color='#1f77b4'):
+    """Draw one series' history, forecast and interval band on an existing axis.
+
+    history has Year plus a value column, forecast is a slice of forecast_panel().
+    """
+    value_col = [col for col in history.columns if col != 'Year'][0]
+    ax.plot(history['Year'], history[value_col], marker='o', linewidth=2, markersize=3, color=color)
+    if len(forecast) == 0:
+        return
+    last = history.dropna().iloc[-1]
+    years = np.concatenate([[last['Year']], forecast['Year']])
+    ax.plot(years, np.concatenate([[last[value_col]], forecast['Forecast']]),
+            linestyle='--', linewidth=2, color=color)
+    ax.fill_between(forecast['Year'], forecast['Lower'], forecast['Upper'], color=color, alpha=0.2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Batched forecasts for the master panel')
+    parser.add_argument('--data', default=MASTER_DATASET)
+    parser.add_argument('--method', choices=METHODS, default='damped')
+    parser.add_argument('--end-year', type=int, default=2030)
+    parser.add_argument('--jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    print("Loading and processing data...")
+    df = load_panel(args.data)
+    forecasts = forecast_panel(df, end_year=args.end_year, method=args.method, n_jobs=args.jobs)
+    forecasts.to_csv('indicator_forecasts.csv', index=False)
+    print(f"Forecast {forecasts.groupby(['Country', 'Indicator']).ngroups} series to {args.end_year}")
+
+    with PdfPages('indicator_forecasts.pdf') as pdf:
+        for indicator in DEFAULT_INDICATORS:
+            countries = sorted(df['Country'].unique())
+            cols = 4
+            rows = (len(countries) + cols - 1) // cols
+            fig, axes = plt.subplots(rows, cols, figsize=(20, 5*rows))
+            fig.suptitle(f'{indicator} - History and Forecast to {args.end_year}',
+                         fontsize=16, fontweight='bold', y=0.98)
+            axes = axes.flatten()
+            for i, country in enumerate(countries):
+                history = df.loc[df['Country'] == country, ['Year', indicator]].dropna()
+                future = forecasts[(forecasts['Country'] == country) & (forecasts['Indicator'] == indicator)]
+                if len(history) > 0:
+                    plot_forecast(axes[i], history, future)
+                axes[i].set_title(f'{country}', fontsize=10, fontweight='bold')
+                axes[i].set_xlabel('Year', fontsize=8)
+                axes[i].grid(True, alpha=0.3)
+                axes[i].tick_params(axis='both', which='major', labelsize=7)
+            for i in range(len(countries), len(axes)):
+                axes[i].set_visible(False)
+            plt.tight_layout()
+            pdf.savefig()
+            plt.close()
+
+    print("PDF file 'indicator_forecasts.pdf' has been created successfully!")
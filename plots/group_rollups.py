@@ -0,0 +1,217 @@
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from panel import MASTER_DATASET, country_groups, indicator_columns, load_panel, panel_cube
+
+# Materialized group-level time series for every indicator of the panel.
+# Summaries are computed once per (grouping, indicator, group) and kept until a
+# member series changes, so group comparisons are dictionary lookups.
+#
+# The panel has no population column, so there is no built-in weight: a
+# GDP_per_capita-weighted mean is not a GDP-weighted aggregate. Pass a
+# (Country, Year) population Series (--population on the command line) to get
+# 'population' weights and 'GDP' weights (GDP_per_capita x population).
+
+
+def summarize(values, weights):
+    """Group statistics per year for a (members, years) block of one indicator.
+
+    weights maps a weight name to a (members, years) array; cells where the
+    value or weight is missing are left out of that weighted mean.
+    """
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=0)
+    with warnings.catch_warnings():
+        # All-NaN years simply produce NaN statistics
+        warnings.simplefilter('ignore', RuntimeWarning)
+        stats = {
+            'count': count,
+            'mean': np.nanmean(values, axis=0),
+            'median': np.nanmedian(values, axis=0),
+            'std': np.nanstd(values, axis=0, ddof=1),
+            'min': np.nanmin(values, axis=0),
+            'max': np.nanmax(values, axis=0),
+        }
+        for name, w in weights.items():
+            w = np.where(observed & ~np.isnan(w), w, 0.0)
+            total = w.sum(axis=0)
+            wmean = np.where(observed, values, 0.0) * w
+            wmean = wmean.sum(axis=0) / total
+            wvar = (w * np.where(observed, values - wmean, 0.0) ** 2).sum(axis=0) / total
+            stats[f'mean_{name}'] = np.where(total > 0, wmean, np.nan)
+            stats[f'median_{name}'] = np.where(total > 0, weighted_median(values, w), np.nan)
+            stats[f'std_{name}'] = np.where(total > 0, np.sqrt(wvar), np.nan)
+    return stats
+
+
+def weighted_median(values, weights):
+    """Per-year weighted median of a (members, years) block.
+
+    Cells with zero weight (missing value or weight) are ignored; the result
+    is the first sorted value whose cumulative weight reaches half the total.
+    """
+    order = np.argsort(np.where(weights > 0, values, np.inf), axis=0)
+    sorted_values = np.take_along_axis(values, order, axis=0)
+    cumulative = np.cumsum(np.take_along_axis(weights, order, axis=0), axis=0)
+    half = cumulative[-1] / 2
+    pick = (cumulative >= half[None, :]).argmax(axis=0)
+    return sorted_values[pick, np.arange(values.shape[1])]
+
+
+class GroupRollups:
+    """Weighted and unweighted group aggregates, updated incrementally.
+
+    groupings maps a grouping name to {country: group}; the master panel's
+    Country_Group split is always available. weights maps a weight name to a
+    panel column, a Series indexed by (Country, Year), or a (panel column,
+    Series) pair whose product is the weight. population, if given, adds
+    'population' and 'GDP' (GDP_per_capita x population) weights.
+    """
+
+    def __init__(self, df, groupings=None, weights=None, population=None):
+        self.indicators = indicator_columns(df)
+        self.countries, self.years, cube = panel_cube(df, self.indicators)
+        self.values = {ind: cube[:, :, i] for i, ind in enumerate(self.indicators)}
+        self.row = {country: i for i, country in enumerate(self.countries)}
+
+        self.weights = {}
+        self.weight_grids = {}
+        weights = dict(weights or {})
+        if population is not None:
+            weights.setdefault('population', population)
+            weights.setdefault('GDP', ('GDP_per_capita', population))
+        for name, source in weights.items():
+            self.set_weight(name, source, rebuild=False)
+
+        self.groupings = {}
+        self.tables = {}
+        self.add_grouping('Country_Group', country_groups(df))
+        for name, mapping in (groupings or {}).items():
+            self.add_grouping(name, mapping)
+
+    def _grid(self, series):
+        """Place a (Country, Year) indexed Series on the country x year grid."""
+        grid = np.full((len(self.countries), len(self.years)), np.nan)
+        series = series.dropna()
+        countries = series.index.get_level_values(0)
+        years = series.index.get_level_values(1).to_numpy()
+        keep = countries.isin(self.row) & (years >= self.years[0]) & (years <= self.years[-1])
+        rows = np.array([self.row[c] for c in countries[keep]], dtype=int)
+        grid[rows, years[keep] - self.years[0]] = series.to_numpy()[keep]
+        return grid
+
+    def set_weight(self, name, source, rebuild=True):
+        """Add or replace a weight: panel column, (Country, Year) Series, or
+        (panel column, Series) pair multiplied together."""
+        self.weights[name] = source
+        if isinstance(source, tuple):
+            self.weight_grids[name] = self._grid(source[1])
+        elif not isinstance(source, str):
+            self.weight_grids[name] = self._grid(source)
+        if rebuild:
+            for grouping in self.groupings:
+                self._materialize(grouping, self.indicators)
+
+    def _weight_arrays(self, rows):
+        arrays = {}
+        for name, source in self.weights.items():
+            if isinstance(source, str):
+                grid = self.values[source]
+            elif isinstance(source, tuple):
+                grid = self.values[source[0]] * self.weight_grids[name]
+            else:
+                grid = self.weight_grids[name]
+            arrays[name] = grid[rows]
+        return arrays
+
+    def add_grouping(self, name, mapping):
+        """Register a user-defined {country: group} mapping and materialize it."""
+        self.groupings[name] = {c: g for c, g in mapping.items() if c in self.row}
+        self._materialize(name, self.indicators)
+
+    def _members(self, grouping, group):
+        return [self.row[c] for c, g in self.groupings[grouping].items() if g == group]
+
+    def _materialize(self, grouping, indicators, groups=None):
+        if groups is None:
+            groups = set(self.groupings[grouping].values())
+        for group in groups:
+            rows = self._members(grouping, group)
+            weights = self._weight_arrays(rows)
+            for indicator in indicators:
+                stats = summarize(self.values[indicator][rows], weights)
+                table = pd.DataFrame(stats, index=pd.Index(self.years, name='Year'))
+                self.tables[(grouping, indicator, group)] = table[table['count'] > 0]
+
+    def update(self, indicator, values):
+        """Replace cells of one indicator (Series indexed by (Country, Year)).
+
+        Only the groups containing a changed country are recomputed; if the
+        indicator is also a weight, every indicator of those groups is.
+        """
+        grid = self._grid(values)
+        changed = ~np.isnan(grid)
+        new = indicator not in self.values
+        if new:
+            self.indicators.append(indicator)
+            self.values[indicator] = np.full_like(grid, np.nan)
+        self.values[indicator][changed] = grid[changed]
+
+        if new:
+            # Every group needs a table, including groups with no data yet
+            for grouping in self.groupings:
+                self._materialize(grouping, [indicator])
+            return
+
+        touched = set(self.countries[changed.any(axis=1)])
+        columns = {source if isinstance(source, str) else source[0]
+                   for source in self.weights.values() if isinstance(source, (str, tuple))}
+        is_weight = indicator in columns
+        indicators = self.indicators if is_weight else [indicator]
+        for grouping, mapping in self.groupings.items():
+            groups = {mapping[c] for c in touched if c in mapping}
+            self._materialize(grouping, indicators, groups)
+
+    def lookup(self, indicator, grouping='Country_Group', group=None):
+        """Materialized summary for one group, or all groups of a grouping."""
+        if group is not None:
+            return self.tables[(grouping, indicator, group)]
+        groups = sorted(set(self.groupings[grouping].values()))
+        return pd.concat({g: self.tables[(grouping, indicator, g)] for g in groups},
+                         names=[grouping]).reset_index()
+
+
+def read_population(path):
+    """Population Series indexed by (Country, Year) from a long CSV with
+    Country, Year and one value column."""
+    df = pd.read_csv(path, na_values=['NA'])
+    value_columns = [col for col in df.columns if col not in ('Country', 'Year')]
+    if len(value_columns) != 1:
+        raise ValueError(f"Expected Country, Year and one value column in {path}, got {list(df.columns)}")
+    df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+    df = df.dropna(subset=['Year']).astype({'Year': int})
+    return df.set_index(['Country', 'Year'])[value_columns[0]].astype(float)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Materialize group rollups of the master panel')
+    parser.add_argument('--data', default=MASTER_DATASET)
+    parser.add_argument('--population',
+                        help='CSV with Country, Year and population columns; needed for the '
+                             'population- and GDP-weighted columns (mean_population, mean_GDP, ...)')
+    args = parser.parse_args()
+
+    print("Loading and processing data...")
+    population = read_population(args.population) if args.population else None
+    rollups = GroupRollups(load_panel(args.data), population=population)
+    summary = pd.concat([rollups.lookup(ind).assign(Indicator=ind) for ind in rollups.indicators])
+    summary.to_csv('group_rollups.csv', index=False)
+    print(f"Materialized {len(rollups.tables)} group series for {len(rollups.indicators)} indicators")
+    if population is None:
+        print("No --population given: only unweighted statistics were written")
+    else:
+        print(f"Weighted by: {', '.join(rollups.weights)}")
+    print("Saved to 'group_rollups.csv'")
@@ -2,6 +2,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
+from panel import MASTER_DATASET, load_panel
+from pension_scenarios import simulate_panel, write_fan_charts
 
 # Load the data
 print("Loading and processing data...")
@@ -43,4 +45,11 @@ with PdfPages('old_age_dependency_trend.pdf') as pdf:
     pdf.savefig()
     plt.close()
 
+    # Monte Carlo fan charts of old-age dependency and the pension financing gap,
+    # one page per country of the master panel
+    print("Simulating pension scenarios...")
+    panel = load_panel(MASTER_DATASET)
+    n_scenario_pages = write_fan_charts(pdf, panel, simulate_panel(panel))
+    print(f"Added scenario fan charts for {n_scenario_pages} countries")
+
 print("Analysis complete! PDF saved as 'old_age_dependency_trend.pdf'") 
\ No newline at end of file
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Cleaned country-year panel written by R/create_summary_statistics.R
+MASTER_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'R', 'master_dataset.csv')
+
+ID_COLUMNS = ['Country', 'Year', 'Country_Group']
+
+
+def load_panel(path=MASTER_DATASET):
+    """Load the cleaned master panel, sorted by country and year."""
+    df = pd.read_csv(path, na_values=['NA'])
+    df['Year'] = pd.to_numeric(df['Year'], errors='coerce').astype(int)
+    return df.sort_values(['Country', 'Year']).reset_index(drop=True)
+
+
+def indicator_columns(df):
+    """Numeric indicator columns of the panel (everything but the id columns)."""
+    return [col for col in df.columns if col not in ID_COLUMNS]
+
+
+def panel_cube(df, indicators=None):
+    """Align the panel on a full country x year grid.
+
+    Returns (countries, years, cube) where cube has shape
+    (n_countries, n_years, n_indicators) and missing cells are NaN.
+    """
+    if indicators is None:
+        indicators = indicator_columns(df)
+    countries = np.array(sorted(df['Country'].unique()))
+    years = np.arange(df['Year'].min(), df['Year'].max() + 1)
+
+    cube = np.full((len(countries), len(years), len(indicators)), np.nan)
+    rows = np.searchsorted(countries, df['Country'].to_numpy())
+    cols = df['Year'].to_numpy() - years[0]
+    cube[rows, cols, :] = df[indicators].to_numpy(dtype=float)
+    return countries, years, cube
+
+
+def country_groups(df):
+    """Mapping of country -> Country_Group as stored in the master panel."""
+    return df.drop_duplicates('Country').set_index('Country')['Country_Group'].to_dict()
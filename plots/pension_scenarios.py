@@ -0,0 +1,172 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+
+from panel import MASTER_DATASET, load_panel
+
+# Monte Carlo projection of old-age dependency and the pension financing gap.
+#
+# Per country, all scenarios are simulated together as (n_scenarios, horizon)
+# arrays:
+#   - log TFR follows a random walk whose drift (recent trend) fades out
+#   - log life expectancy at 65 follows a random walk with drift (Lee-Carter style)
+#   - old-age dependency keeps its recent (slowly fading) growth, rises with longevity
+#     surprises and falls when cohorts born after a fertility surprise enter
+#     working age (ENTRY_LAG years later, ENTRY_SHARE of the workforce a year)
+#   - pension spending scales with the dependency ratio (constant benefit
+#     ratio), contributions stay at their last share of GDP
+# This is a stylised model for comparing countries, not a cohort-component
+# population projection.
+
+INPUTS = ['TFR', 'Life_expectancy_65', 'Old_age_dependency', 'Pension_GDP', 'Social_security_GDP']
+QUANTILES = np.array([0.05, 0.25, 0.5, 0.75, 0.95])
+
+TREND_YEARS = 20
+DRIFT_DECAY = 0.9
+GROWTH_DECAY = 0.97
+LONGEVITY_ELASTICITY = 1.0
+ENTRY_LAG = 20
+ENTRY_SHARE = 1 / 50
+
+
+def country_inputs(df, country):
+    """Last observed levels and recent trend/volatility for one country."""
+    data = df[df['Country'] == country].set_index('Year')[INPUTS]
+    if data.dropna(how='all').empty or data[INPUTS].notna().sum().min() < 3:
+        return None
+
+    def trend(series, log=False):
+        series = series.dropna().tail(TREND_YEARS + 1)
+        values = np.log(series) if log else series
+        steps = values.diff().dropna() / np.diff(series.index.to_numpy())
+        return series.iloc[-1], steps.mean(), steps.std(ddof=1) if len(steps) > 1 else 0.0
+
+    tfr, tfr_drift, tfr_sigma = trend(data['TFR'], log=True)
+    le, le_drift, le_sigma = trend(data['Life_expectancy_65'], log=True)
+    oad, oad_growth, _ = trend(data['Old_age_dependency'], log=True)
+    return {
+        'base_year': int(data['Old_age_dependency'].dropna().index.max()),
+        'tfr': tfr, 'tfr_drift': tfr_drift, 'tfr_sigma': tfr_sigma,
+        'le': le, 'le_drift': le_drift, 'le_sigma': le_sigma,
+        'oad': oad, 'oad_growth': oad_growth,
+        'pension': data['Pension_GDP'].dropna().iloc[-1],
+        'contributions': data['Social_security_GDP'].dropna().iloc[-1],
+    }
+
+
+def simulate_country(params, horizon, n_scenarios, seed):
+    """Simulate all scenarios for one country as batched array operations.
+
+    Returns a dict of (n_scenarios, horizon) arrays.
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.arange(1, horizon + 1)
+
+    # Fertility: damped drift plus cumulative shocks; baseline has no shocks
+    drift = params['tfr_drift'] * DRIFT_DECAY ** steps
+    shocks = params['tfr_sigma'] * rng.standard_normal((n_scenarios, horizon))
+    log_tfr_base = np.log(params['tfr']) + np.cumsum(drift)
+    log_tfr = log_tfr_base + np.cumsum(shocks, axis=1)
+
+    # Longevity at 65: random walk with drift in logs
+    longevity_surprise = params['le_sigma'] * rng.standard_normal((n_scenarios, horizon))
+    le = params['le'] * np.exp(np.cumsum(params['le_drift'] + longevity_surprise, axis=1))
+
+    # Fertility surprises reach the workforce ENTRY_LAG years later
+    entry = np.zeros((n_scenarios, horizon))
+    if horizon > ENTRY_LAG:
+        entry[:, ENTRY_LAG:] = ENTRY_SHARE * (log_tfr - log_tfr_base)[:, :horizon - ENTRY_LAG]
+
+    growth = params['oad_growth'] * GROWTH_DECAY ** (steps - 1)
+    log_oad_steps = growth + LONGEVITY_ELASTICITY * longevity_surprise - entry
+    oad = params['oad'] * np.exp(np.cumsum(log_oad_steps, axis=1))
+
+    pension = params['pension'] * oad / params['oad']
+    gap = pension - params['contributions']
+    return {'TFR': np.exp(log_tfr), 'Life_expectancy_65': le,
+            'Old_age_dependency': oad, 'Pension_financing_gap': gap}
+
+
+def _run_country(args):
+    country, params, horizon, n_scenarios, seed = args
+    paths = simulate_country(params, horizon, n_scenarios, seed)
+    years = params['base_year'] + np.arange(1, horizon + 1)
+    fans = {name: np.quantile(values, QUANTILES, axis=0) for name, values in paths.items()}
+    return country, years, fans
+
+
+def simulate_panel(df, end_year=2050, n_scenarios=5000, seed=2024, n_jobs=1):
+    """Yield (country, years, fans) per country, in country order, as results arrive.
+
+    fans maps each projected variable to a (len(QUANTILES), horizon) array.
+    Every country gets its own child of SeedSequence(seed), so results do not
+    depend on n_jobs.
+    """
+    countries = sorted(df['Country'].unique())
+    seeds = np.random.SeedSequence(seed).spawn(len(countries))
+    tasks = []
+    for country, child in zip(countries, seeds):
+        params = country_inputs(df, country)
+        if params is None or end_year <= params['base_year']:
+            continue
+        tasks.append((country, params, end_year - params['base_year'], n_scenarios, child))
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            yield from pool.map(_run_country, tasks)
+    else:
+        yield from map(_run_country, tasks)
+
+
+def plot_fan_chart(ax, history, years, fan, color='#1f77b4'):
+    """History line plus 50% and 90% scenario bands on an existing axis."""
+    ax.plot(history.index, history.values, marker='o', linewidth=2, markersize=3, color=color)
+    ax.fill_between(years, fan[0], fan[4], color=color, alpha=0.15, label='90% of scenarios')
+    ax.fill_between(years, fan[1], fan[3], color=color, alpha=0.3, label='50% of scenarios')
+    ax.plot(years, fan[2], linestyle='--', linewidth=2, color=color, label='Median')
+
+
+def write_fan_charts(pdf, df, results):
+    """Stream one page per country into an open PdfPages as results arrive."""
+    n_pages = 0
+    for country, years, fans in results:
+        data = df[df['Country'] == country].set_index('Year')
+        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+        fig.suptitle(f'{country} - Pension Scenarios to {years[-1]}', fontsize=16, fontweight='bold')
+        for ax, name, label in [
+            (axes[0], 'Old_age_dependency', 'Old-age Dependency Ratio (%)'),
+            (axes[1], 'Pension_financing_gap', 'Pension Financing Gap (% of GDP)'),
+        ]:
+            plot_fan_chart(ax, data[name].dropna(), years, fans[name])
+            ax.set_title(label, fontsize=12, fontweight='bold')
+            ax.set_xlabel('Year', fontsize=10)
+            ax.grid(True, alpha=0.3)
+            ax.legend(fontsize=9, loc='upper left')
+        plt.tight_layout()
+        pdf.savefig()
+        plt.close()
+        n_pages += 1
+    return n_pages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo pension scenarios for the master panel')
+    parser.add_argument('--data', default=MASTER_DATASET)
+    parser.add_argument('--end-year', type=int, default=2050)
+    parser.add_argument('--scenarios', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    print("Loading and processing data...")
+    df = load_panel(args.data)
+    results = simulate_panel(df, args.end_year, args.scenarios, args.seed, args.jobs)
+
+    with PdfPages('pension_scenarios.pdf') as pdf:
+        n_countries = write_fan_charts(pdf, df, results)
+
+    print("PDF file 'pension_scenarios.pdf' has been created successfully!")
+    print(f"Contains {args.scenarios} scenarios for {n_countries} countries to {args.end_year}")
@@ -0,0 +1,114 @@
+import argparse
+import csv
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Streaming wide-to-long reshaper for World Bank (WDI) CSV exports.
+#
+# The wide file is read one row at a time and only non-empty cells are kept,
+# as (country, indicator, year, value) entries in typed arrays: 2-byte ids and
+# years, 4-byte values. Peak memory follows the number of observations kept,
+# not the size of the wide file, so a full WDI bulk export can be filtered to
+# a few indicator codes without materialising the melt of every year column.
+
+ID_COLUMNS = ['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code']
+
+
+def iter_wdi_rows(path, indicator_codes=None):
+    """Yield (country_name, country_code, indicator_code, years, values) per row.
+
+    Metadata lines above the 'Country Name' header are skipped. years and
+    values only hold the cells that parse as numbers, so empty cells and
+    placeholders such as DataBank's '..' are dropped.
+    """
+    codes = set(indicator_codes) if indicator_codes is not None else None
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        for header in reader:
+            if header and header[0] == 'Country Name':
+                break
+        else:
+            raise ValueError(f"No 'Country Name' header found in {path}")
+
+        position = {name: header.index(name) for name in ID_COLUMNS}
+        year_columns = [(i, int(col)) for i, col in enumerate(header) if col.strip().isdigit()]
+
+        for row in reader:
+            if len(row) < len(ID_COLUMNS) or not row[position['Country Name']]:
+                continue
+            code = row[position['Indicator Code']]
+            if codes is not None and code not in codes:
+                continue
+            years, values = [], []
+            for i, year in year_columns:
+                cell = row[i].strip() if i < len(row) else ''
+                if not cell:
+                    continue
+                try:
+                    value = float(cell)
+                except ValueError:
+                    continue
+                years.append(year)
+                values.append(value)
+            if values:
+                yield row[position['Country Name']], row[position['Country Code']], code, years, values
+
+
+def read_wdi_long(path, indicator_codes=None, value_name='Value'):
+    """Read a WDI wide file into a compact long frame of non-null observations.
+
+    Columns: Country Name, Country Code and Indicator Code (categorical, with
+    alphabetically ordered categories like the object columns pandas would
+    give), Year (int16) and value_name (float32).
+    """
+    countries = {}
+    indicators = {}
+    country_ids = array('H')
+    indicator_ids = array('H')
+    years = array('h')
+    values = array('f')
+
+    for name, code, indicator, row_years, row_values in iter_wdi_rows(path, indicator_codes):
+        country_id = countries.setdefault((name, code), len(countries))
+        indicator_id = indicators.setdefault(indicator, len(indicators))
+        country_ids.extend([country_id] * len(row_values))
+        indicator_ids.extend([indicator_id] * len(row_values))
+        years.extend(row_years)
+        values.extend(row_values)
+
+    country_ids = np.frombuffer(country_ids, dtype=np.uint16)
+    indicator_ids = np.frombuffer(indicator_ids, dtype=np.uint16)
+    return pd.DataFrame({
+        'Country Name': _sorted_categorical(country_ids, [name for name, _ in countries]),
+        'Country Code': _sorted_categorical(country_ids, [code for _, code in countries]),
+        'Indicator Code': _sorted_categorical(indicator_ids, list(indicators)),
+        'Year': np.frombuffer(years, dtype=np.int16),
+        value_name: np.frombuffer(values, dtype=np.float32),
+    })
+
+
+def _sorted_categorical(ids, labels):
+    """Categorical of labels[ids] with categories in sorted order."""
+    categories = sorted(set(labels))
+    position = {label: i for i, label in enumerate(categories)}
+    remap = np.array([position[label] for label in labels], dtype=np.int16)
+    return pd.Categorical.from_codes(remap[ids], categories)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reshape a World Bank wide CSV to long format')
+    parser.add_argument('path')
+    parser.add_argument('--indicator', action='append', dest='indicators',
+                        help='Indicator code to keep (repeatable, default: all)')
+    parser.add_argument('--output', default='wdi_long.csv')
+    args = parser.parse_args()
+
+    print(f"Reading {args.path}...")
+    df_long = read_wdi_long(args.path, args.indicators)
+    df_long.to_csv(args.output, index=False)
+    print(f"{len(df_long)} observations for {df_long['Country Code'].nunique()} economies "
+          f"and {df_long['Indicator Code'].nunique()} indicators")
+    print(f"In memory: {df_long.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(f"Saved to '{args.output}'")